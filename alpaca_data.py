@@ -12,40 +12,54 @@ load_dotenv()
 ALPACA_KEY = os.environ.get('ALPACA_KEY')
 ALPACA_SECRET = os.environ.get('ALPACA_SECRET')
 
-def get_tqqq_price():
+# One client for the whole process: alpaca-py keeps an HTTP session with a
+# warm connection pool inside the client, so rebuilding it on every call
+# pays a fresh TLS handshake that dwarfs the actual quote round trip.
+_CLIENT = None
+
+def _get_client():
+    """Returns the shared Alpaca data client, creating it on first use."""
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = StockHistoricalDataClient(ALPACA_KEY, ALPACA_SECRET)
+    return _CLIENT
+
+def get_latest_ask_prices(symbols):
     """
-    Connects to Alpaca, fetches the latest price for TQQQ, and returns it.
+    Fetches the latest ask price for one or more symbols in a single request.
+
+    Args:
+        symbols: A symbol string or list of symbol strings.
 
     Returns:
-        float: The last price of TQQQ, or None if an error occurs.
+        dict: Mapping of symbol to ask price for the symbols that resolved,
+              or None if an error occurs.
     """
     if not ALPACA_KEY or not ALPACA_SECRET:
         print("Error: ALPACA_KEY and ALPACA_SECRET environment variables must be set.")
         return None
 
-    # Create a data client
-    data_client = StockHistoricalDataClient(ALPACA_KEY, ALPACA_SECRET)
-
-    # Ticker symbol for TQQQ
-    tqqq_symbol = "TQQQ"
-
     try:
-        # Prepare the request for the latest quote
-        request_params = StockLatestQuoteRequest(symbol_or_symbols=tqqq_symbol)
-
-        # Get the latest quote
-        latest_quote = data_client.get_stock_latest_quote(request_params)
-
-        # Extract the ask price (or bid price, depending on your strategy)
-        if latest_quote and tqqq_symbol in latest_quote:
-            return latest_quote[tqqq_symbol].ask_price
-
-        return None
-
+        # Alpaca accepts a list of symbols, so a batch costs one round trip
+        request_params = StockLatestQuoteRequest(symbol_or_symbols=symbols)
+        latest_quotes = _get_client().get_stock_latest_quote(request_params)
+        return {symbol: quote.ask_price for symbol, quote in latest_quotes.items()}
     except Exception as e:
-        print(f"Error fetching price from Alpaca: {e}")
+        print(f"Error fetching prices from Alpaca: {e}")
         return None
 
+def get_tqqq_price():
+    """
+    Fetches the latest price for TQQQ from Alpaca and returns it.
+
+    Returns:
+        float: The last price of TQQQ, or None if an error occurs.
+    """
+    prices = get_latest_ask_prices("TQQQ")
+    if prices:
+        return prices.get("TQQQ")
+    return None
+
 if __name__ == '__main__':
     # Example of how to use the function
     # Make sure to set your environment variables before running this
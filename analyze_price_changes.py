@@ -0,0 +1,42 @@
+import sqlite3
+
+# --- CONFIGURATION ---
+DB_FILE = 'tqqq_synthetic_data.sqlite'
+TABLE_NAME = 'minute_bars'
+CHANGE_THRESHOLD = 0.01  # 1% bar-over-bar move
+
+
+def analyze_price_volatility():
+    """
+    Counts the 1-minute bars whose close moved at least 1% versus the
+    previous bar, in either direction.
+
+    The whole computation runs inside SQLite with a LAG window function,
+    so only the three result counts cross the C-API boundary instead of
+    millions of close values.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        row = conn.execute(f'''
+            SELECT
+                SUM(CASE WHEN close / prev_close - 1 >= ? THEN 1 ELSE 0 END),
+                SUM(CASE WHEN close / prev_close - 1 <= ? THEN 1 ELSE 0 END),
+                COUNT(*)
+            FROM (
+                SELECT close, LAG(close) OVER (ORDER BY timestamp) AS prev_close
+                FROM {TABLE_NAME}
+            )
+        ''', (CHANGE_THRESHOLD, -CHANGE_THRESHOLD)).fetchone()
+    finally:
+        conn.close()
+
+    increases, decreases, total = int(row[0] or 0), int(row[1] or 0), int(row[2])
+
+    print(f"Analyzed {total} bars.")
+    print(f"Bars with >= +{CHANGE_THRESHOLD:.0%} move: {increases}")
+    print(f"Bars with <= -{CHANGE_THRESHOLD:.0%} move: {decreases}")
+    return increases, decreases, total
+
+
+if __name__ == '__main__':
+    analyze_price_volatility()
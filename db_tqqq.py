@@ -1,15 +1,33 @@
 import sqlite3
 import logging
+import threading
 
 # --- CONFIGURATION ---
 DB_FILE = 'db_tqqq_grid_bot.sqlite'
 log = logging.getLogger(__name__)
 
+# The connection is opened once and kept for the lifetime of the process,
+# so the file-open + PRAGMA setup cost is paid only on the first call and
+# the page cache stays hot across trades. The bot is single-process;
+# writes are serialized with a lock so the connection can be shared
+# across threads safely.
+_CONN = None
+_WRITE_LOCK = threading.Lock()
+
 def get_db_connection():
-    """Creates a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_FILE)
-    conn.row_factory = sqlite3.Row  # This allows accessing columns by name
-    return conn
+    """Returns the long-lived connection to the SQLite database, opening it on first use."""
+    global _CONN
+    if _CONN is None:
+        # No connection-wide row_factory: sqlite3.Row wraps every fetched row
+        # in a name-lookup object, which is pure overhead for internal reads
+        # that index by position. The helpers whose rows are consumed by name
+        # set it per-cursor instead.
+        _CONN = sqlite3.connect(DB_FILE, check_same_thread=False)
+        _CONN.execute('PRAGMA journal_mode=WAL')
+        _CONN.execute('PRAGMA synchronous=NORMAL')
+        _CONN.execute('PRAGMA cache_size=-65536')
+        _CONN.execute('PRAGMA temp_store=MEMORY')
+    return _CONN
 
 def initialize_database():
     """
@@ -47,7 +65,15 @@ def initialize_database():
             );
         ''')
 
+        # Partial index so get_open_trades() is O(open trades) instead of a
+        # full scan; it stays tiny because most rows end up CLOSED.
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_trades_open
+            ON trades(status) WHERE status = 'OPEN'
+        ''')
+
         conn.commit()
+        cursor.execute('PRAGMA optimize')
         log.info("Database initialized successfully. 'trades' table is ready.")
 
     except Exception as e:
@@ -63,16 +89,17 @@ def create_buy_trade(level, buy_order_id, quantity, price, timestamp):
     log.info(f"Recording new BUY in DB: Level {level}, OrderID {buy_order_id}, Qty {quantity}, Price {price}")
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            '''
-            INSERT INTO trades (level, buy_order_id, buy_quantity, buy_price, buy_timestamp, status)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''',
-            (level, buy_order_id, quantity, price, str(timestamp), 'OPEN')
-        )
-        conn.commit()
-        new_id = cursor.lastrowid
+        with _WRITE_LOCK:
+            cursor = conn.cursor()
+            cursor.execute(
+                '''
+                INSERT INTO trades (level, buy_order_id, buy_quantity, buy_price, buy_timestamp, status)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ''',
+                (level, buy_order_id, quantity, price, str(timestamp), 'OPEN')
+            )
+            conn.commit()
+            new_id = cursor.lastrowid
         log.info(f"Successfully recorded new BUY trade with DB ID {new_id}.")
         return new_id
     except sqlite3.IntegrityError:
@@ -81,74 +108,80 @@ def create_buy_trade(level, buy_order_id, quantity, price, timestamp):
     except Exception as e:
         log.error(f"Error creating buy trade in database: {e}")
         raise
-    finally:
-        conn.close()
 
 def update_trade_with_sell_order(db_id, sell_order_id):
     """Updates a trade record with the ID of the corresponding SELL order."""
     log.info(f"Updating trade DB ID {db_id} with SELL OrderID {sell_order_id}")
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            '''
-            UPDATE trades
-            SET sell_order_id = ?
-            WHERE id = ?
-            ''',
-            (sell_order_id, db_id)
-        )
-        conn.commit()
+        with _WRITE_LOCK:
+            conn.execute(
+                '''
+                UPDATE trades
+                SET sell_order_id = ?
+                WHERE id = ?
+                ''',
+                (sell_order_id, db_id)
+            )
+            conn.commit()
         log.info(f"Successfully updated trade DB ID {db_id}.")
     except Exception as e:
         log.error(f"Error updating trade with sell order: {e}")
         # We don't re-raise here to avoid stopping the bot for a non-critical DB update
-    finally:
-        conn.close()
 
 def close_trade(sell_order_id, sell_quantity, sell_price, sell_timestamp):
     """Marks a trade as 'CLOSED' in the database."""
     log.info(f"Closing trade in DB for SELL OrderID {sell_order_id}")
     conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute(
-            '''
-            UPDATE trades
-            SET status = 'CLOSED',
-                sell_quantity = ?,
-                sell_price = ?,
-                sell_timestamp = ?
-            WHERE sell_order_id = ?
-            ''',
-            (sell_quantity, sell_price, str(sell_timestamp), sell_order_id)
-        )
-        conn.commit()
+        with _WRITE_LOCK:
+            conn.execute(
+                '''
+                UPDATE trades
+                SET status = 'CLOSED',
+                    sell_quantity = ?,
+                    sell_price = ?,
+                    sell_timestamp = ?
+                WHERE sell_order_id = ?
+                ''',
+                (sell_quantity, sell_price, str(sell_timestamp), sell_order_id)
+            )
+            conn.commit()
         log.info(f"Successfully closed trade for SELL OrderID {sell_order_id}.")
     except Exception as e:
         log.error(f"Error closing trade in database: {e}")
-    finally:
-        conn.close()
 
 def get_open_trades():
     """Retrieves all trades with status 'OPEN' from the database."""
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM trades WHERE status = 'OPEN'")
-        return cursor.fetchall()
-    finally:
-        conn.close()
+    cursor = get_db_connection().cursor()
+    cursor.row_factory = sqlite3.Row  # callers access these rows by name
+    return cursor.execute("SELECT * FROM trades WHERE status = 'OPEN'").fetchall()
 
 def get_trade_by_sell_order_id(sell_order_id):
     """Retrieves a single trade by its sell_order_id."""
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM trades WHERE sell_order_id = ?", (sell_order_id,))
-        return cursor.fetchone()
-    finally:
-        conn.close()
+    cursor = get_db_connection().cursor()
+    cursor.row_factory = sqlite3.Row  # callers access this row by name
+    return cursor.execute("SELECT * FROM trades WHERE sell_order_id = ?", (sell_order_id,)).fetchone()
+
+def get_trades_by_sell_order_ids(sell_order_ids):
+    """
+    Retrieves trades for a batch of sell_order_ids in a single query.
+
+    One IN (...) round-trip replaces one query per id, which matters on the
+    startup reconciliation path where every open SELL order is looked up.
+
+    Returns:
+        dict: Mapping of sell_order_id -> row for the ids found in the DB.
+    """
+    ids = list(sell_order_ids)
+    if not ids:
+        return {}
+    cursor = get_db_connection().cursor()
+    cursor.row_factory = sqlite3.Row  # callers access these rows by name
+    placeholders = ','.join('?' * len(ids))
+    rows = cursor.execute(
+        f"SELECT * FROM trades WHERE sell_order_id IN ({placeholders})", ids).fetchall()
+    return {row['sell_order_id']: row for row in rows}
 if __name__ == '__main__':
     # This allows you to run this file directly to set up the database
     logging.basicConfig(level=logging.INFO)
@@ -0,0 +1,72 @@
+import asyncio
+import sqlite3
+
+import pandas as pd
+from tvDatafeed import TvDatafeed, Interval
+
+# --- CONFIGURATION ---
+DB_FILE = 'tqqq_daily_data.sqlite'
+TABLE_NAME = 'daily_bars'
+SYMBOLS = ['TQQQ']
+EXCHANGE = 'NASDAQ'
+NUM_BARS_TO_FETCH = 5000
+
+
+def _fetch_symbol(tv, symbol):
+    """Downloads the daily bars for one symbol (blocking tvDatafeed call)."""
+    print(f"Downloading {NUM_BARS_TO_FETCH} daily bars for {symbol}...")
+    data = tv.get_hist(symbol=symbol, exchange=EXCHANGE,
+                       interval=Interval.in_daily, n_bars=NUM_BARS_TO_FETCH)
+    if data is None or data.empty:
+        print(f"No data received for {symbol}.")
+        return None
+    data = data.reset_index().rename(columns={'datetime': 'timestamp'})
+    data['timestamp'] = data['timestamp'].astype(str)
+    return data
+
+
+async def download_and_store_data():
+    """
+    Downloads daily bars for all configured symbols concurrently and
+    upserts them into the local SQLite database.
+
+    tvDatafeed is blocking, so each fetch runs in a thread and the network
+    round trips overlap: total latency is ~one RTT instead of one per
+    symbol. All results are merged in a single transaction through a
+    staging table keyed on (symbol, timestamp), so an incremental run only
+    touches the pages of the new rows.
+    """
+    tv = TvDatafeed()
+    results = await asyncio.gather(
+        *[asyncio.to_thread(_fetch_symbol, tv, symbol) for symbol in SYMBOLS])
+    frames = [data for data in results if data is not None]
+    if not frames:
+        print("No data received from TradingView.")
+        return
+    data = pd.concat(frames, ignore_index=True)
+    print(f"Downloaded {len(data)} bars across {len(frames)} symbols.")
+
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+                timestamp TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                open REAL, high REAL, low REAL, close REAL,
+                volume REAL,
+                PRIMARY KEY (timestamp, symbol)
+            )
+        ''')
+        with conn:
+            data.to_sql('_staging_daily_bars', conn,
+                        if_exists='replace', index=False)
+            conn.execute(f'INSERT OR REPLACE INTO {TABLE_NAME} '
+                         'SELECT * FROM _staging_daily_bars')
+            conn.execute('DROP TABLE _staging_daily_bars')
+        print(f"Upserted {len(data)} bars into '{TABLE_NAME}'.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(download_and_store_data())
@@ -0,0 +1,151 @@
+import sqlite3
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# --- CONFIGURATION ---
+SOURCE_DB_FILE = 'tqqq_daily_data.sqlite'
+SYNTHETIC_DB_FILE = 'tqqq_synthetic_data.sqlite'
+DAILY_TABLE_NAME = 'daily_bars'
+SYNTHETIC_TABLE_NAME = 'minute_bars'
+TRADING_MINUTES_PER_DAY = 390  # 09:30 -> 16:00
+VOLATILITY_FACTOR = 0.1  # per-minute step size as a fraction of the daily range
+
+# Single PCG64 generator created once: ~2x faster per draw than the legacy
+# Mersenne-Twister np.random.randn, and one bulk call amortizes the
+# per-call overhead across all days.
+RNG = np.random.default_rng()
+
+# Constant 0..1 ramp used to drift every path onto its daily close;
+# identical across days, so build it once instead of per call.
+_DRIFT_SCALE = np.linspace(0.0, 1.0, TRADING_MINUTES_PER_DAY)
+
+# The 390 intraday minute offsets are the same for every trading day:
+# precompute them once and broadcast-add against the day starts.
+_MINUTE_OFFSETS = (np.arange(TRADING_MINUTES_PER_DAY)
+                   * np.timedelta64(1, 'm')).astype('timedelta64[ns]')
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, nogil=True, fastmath=True, cache=True)
+    def _generate_paths_numba(opens, highs, lows, closes, volatilities, steps, out):
+        # One day per thread, with scalar accumulation instead of the big
+        # NumPy temporaries (noise, cumsum, clip copies) of the fallback path.
+        for d in prange(opens.size):
+            lo = lows[d]
+            hi = highs[d]
+            vol = volatilities[d]
+            s = opens[d]
+            for i in range(steps):
+                s += np.random.randn() * vol
+                if s < lo:
+                    s = lo
+                elif s > hi:
+                    s = hi
+                out[d, i] = s
+            # Drift the path linearly onto the daily close, re-clipping and
+            # rounding to cents in the same pass.
+            drift = closes[d] - out[d, steps - 1]
+            denom = steps - 1
+            for i in range(steps):
+                v = out[d, i] + drift * i / denom
+                if v < lo:
+                    v = lo
+                elif v > hi:
+                    v = hi
+                out[d, i] = np.floor(v * 100.0 + 0.5) / 100.0
+            out[d, 0] = opens[d]
+            out[d, steps - 1] = closes[d]
+
+
+def generate_paths(opens, highs, lows, closes, steps, volatilities):
+    """
+    Generates constrained random-walk price paths for all days at once.
+
+    Each row of the returned (n_days, steps) array starts at that day's open,
+    ends exactly at that day's close, and never leaves the [low, high] range.
+    When Numba is available the days are processed in parallel with
+    stack-local scalars; otherwise a vectorized NumPy fallback is used: one
+    bulk noise draw, one cumulative sum, one clip, one drift correction and
+    a final re-clip.
+
+    Returns:
+        np.ndarray: Array of shape (n_days, steps) with the synthetic closes.
+    """
+    n_days = opens.size
+    if NUMBA_AVAILABLE:
+        # float32 halves the footprint of the (n_days, steps) result and the
+        # write bandwidth into SQLite; cents-rounded closes fit comfortably.
+        out = np.empty((n_days, steps), dtype=np.float32)
+        _generate_paths_numba(opens, highs, lows, closes, volatilities, steps, out)
+        return out
+
+    noise = np.empty((n_days, steps), dtype=np.float64)
+    RNG.standard_normal(out=noise)
+    noise *= volatilities[:, None]
+    paths = opens[:, None] + np.cumsum(noise, axis=1)
+    np.clip(paths, lows[:, None], highs[:, None], out=paths)
+
+    # Drift each path linearly so it lands exactly on the daily close,
+    # then re-clip since the drift can push values past the extremes again.
+    drift_scale = _DRIFT_SCALE if steps == _DRIFT_SCALE.size else np.linspace(0.0, 1.0, steps)
+    paths += drift_scale[None, :] * (closes - paths[:, -1])[:, None]
+    np.clip(paths, lows[:, None], highs[:, None], out=paths)
+
+    paths[:, 0] = opens
+    paths[:, -1] = closes
+    return np.round(paths, 2).astype(np.float32)
+
+
+def generate_and_store_synthetic_data():
+    """
+    Reads the daily bars, expands every day into 390 one-minute synthetic
+    closes and stores the result in the synthetic database.
+    """
+    print(f"Reading daily bars from '{SOURCE_DB_FILE}'...")
+    conn_source = sqlite3.connect(SOURCE_DB_FILE)
+    rows = conn_source.execute(
+        f"SELECT timestamp, open, high, low, close "
+        f"FROM {DAILY_TABLE_NAME} ORDER BY timestamp ASC").fetchall()
+    conn_source.close()
+    print(f"Loaded {len(rows)} daily bars.")
+
+    # Only the needed columns, straight into ndarrays: the hot kernel never
+    # sees a DataFrame or pandas per-access machinery.
+    ohlc = np.array([row[1:] for row in rows], dtype=np.float64)
+    opens, highs, lows, closes = ohlc[:, 0], ohlc[:, 1], ohlc[:, 2], ohlc[:, 3]
+    volatilities = (highs - lows) * VOLATILITY_FACTOR
+
+    print(f"Generating {len(rows)} x {TRADING_MINUTES_PER_DAY} synthetic minute closes...")
+    paths = generate_paths(opens, highs, lows, closes,
+                           TRADING_MINUTES_PER_DAY, volatilities)
+
+    # Build all timestamps in one broadcasted datetime64 operation:
+    # every trading day starts at 09:30 and advances one minute per step.
+    day_starts = (pd.to_datetime([row[0] for row in rows]).normalize()
+                  + pd.Timedelta(hours=9, minutes=30)).to_numpy()
+    timestamps = (day_starts[:, None] + _MINUTE_OFFSETS).ravel()
+
+    synthetic_df = pd.DataFrame({'timestamp': timestamps, 'close': paths.ravel()})
+
+    print(f"Storing {len(synthetic_df)} synthetic bars to '{SYNTHETIC_DB_FILE}'...")
+    conn_dest = sqlite3.connect(SYNTHETIC_DB_FILE)
+    synthetic_df.to_sql(SYNTHETIC_TABLE_NAME, conn_dest,
+                        if_exists='replace', index=False)
+    # Index the timestamp so ORDER BY / window scans downstream (e.g. the
+    # volatility analyzer) don't need a sort pass.
+    conn_dest.execute(
+        f'CREATE INDEX IF NOT EXISTS idx_{SYNTHETIC_TABLE_NAME}_timestamp '
+        f'ON {SYNTHETIC_TABLE_NAME}(timestamp)')
+    conn_dest.commit()
+    conn_dest.close()
+    print("Synthetic data generated and stored successfully.")
+
+
+if __name__ == '__main__':
+    generate_and_store_synthetic_data()
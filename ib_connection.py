@@ -0,0 +1,39 @@
+import atexit
+import logging
+
+from ib_insync import IB
+
+# --- CONFIGURATION ---
+IB_HOST = '127.0.0.1'
+IB_PORT = 7497
+IB_CLIENT_ID = 102
+
+log = logging.getLogger(__name__)
+
+# One IB client for the whole process. TWS enforces per-connection auth and
+# warm-up, so the TCP + handshake + marketDataType negotiation (hundreds of
+# milliseconds) is paid once and amortized across all subsequent calls.
+_IB = IB()
+
+
+async def get_ib():
+    """
+    Returns the shared IB client, connecting it on first use.
+
+    Returns:
+        IB: A connected ib_insync client.
+    """
+    if not _IB.isConnected():
+        log.info(f"Connecting to TWS at {IB_HOST}:{IB_PORT}...")
+        await _IB.connectAsync(IB_HOST, IB_PORT, clientId=IB_CLIENT_ID)
+        _IB.reqMarketDataType(3)  # delayed data, avoids Error 354
+        log.info("Connection to TWS established.")
+    return _IB
+
+
+def _disconnect():
+    if _IB.isConnected():
+        _IB.disconnect()
+
+
+atexit.register(_disconnect)
@@ -0,0 +1,64 @@
+import sqlite3
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 -- only probed for the faster CSV engine
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# --- CONFIGURATION ---
+DATA_FILE_PATH = 'TQQQ_1min_unadjusted.csv'
+DB_FILE = 'tqqq_unadjusted_data.sqlite'
+TABLE_NAME = 'minute_bars'
+INSERT_CHUNK_SIZE = 50000
+
+
+def load_data_to_sqlite():
+    """
+    Reads the unadjusted 1-minute TQQQ CSV and loads it into SQLite.
+
+    The whole load runs as a single transaction with chunked executemany
+    INSERTs, which is orders of magnitude faster than the default
+    row-at-a-time autocommit behaviour on a multi-million-row file.
+    """
+    column_names = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+    dtypes = {'open': 'float32', 'high': 'float32', 'low': 'float32',
+              'close': 'float32', 'volume': 'int32'}
+    print(f"Reading '{DATA_FILE_PATH}'...")
+    if PYARROW_AVAILABLE:
+        # pyarrow's CSV reader is multithreaded and parses the timestamp
+        # column directly to datetime64, roughly halving wall time and peak
+        # memory versus the default C engine; float32/int32 halve it again.
+        df = pd.read_csv(DATA_FILE_PATH, header=None, names=column_names,
+                         sep=',', engine='pyarrow', dtype=dtypes,
+                         parse_dates=['timestamp'])
+    else:
+        df = pd.read_csv(DATA_FILE_PATH, header=None, names=column_names,
+                         sep=',', dtype=dtypes)
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    print(f"Loaded {len(df)} rows.")
+
+    conn = sqlite3.connect(DB_FILE)
+    try:
+        # Bulk-load tuning: no rollback journal to maintain and no fsync per
+        # statement while the single big transaction below is in flight.
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.execute('PRAGMA temp_store=MEMORY')
+
+        print(f"Writing to '{DB_FILE}' table '{TABLE_NAME}'...")
+        with conn:
+            # No method='multi': one flattened INSERT would bind
+            # rows x columns parameters and blow past SQLite's
+            # SQLITE_MAX_VARIABLE_NUMBER cap at this chunk size; plain
+            # executemany inside the transaction is just as fast.
+            df.to_sql(TABLE_NAME, conn, if_exists='replace', index=False,
+                      chunksize=INSERT_CHUNK_SIZE)
+        print("Data loaded successfully.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    load_data_to_sqlite()
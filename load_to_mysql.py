@@ -0,0 +1,72 @@
+import itertools
+
+import pandas as pd
+import mysql.connector
+
+# --- CONFIGURATION ---
+DATA_FILE_PATH = 'TQQQ_1min_unadjusted.csv'
+MYSQL_CONFIG = {
+    'host': 'localhost',
+    'user': 'tqqq',
+    'password': 'tqqq',
+    'database': 'tqqq_data',
+}
+TABLE_NAME = 'minute_bars'
+INSERT_BATCH_SIZE = 5000
+
+
+def load_data_to_mysql():
+    """
+    Reads the unadjusted 1-minute TQQQ CSV and loads it into MySQL.
+
+    Rows are streamed into executemany in fixed-size batches, committed
+    once, so the whole file is never materialized as a Python list of
+    tuples.
+    """
+    print(f"Reading '{DATA_FILE_PATH}'...")
+    df = pd.read_csv(DATA_FILE_PATH, sep=',', header=None,
+                     names=['timestamp', 'open', 'high', 'low', 'close', 'volume'],
+                     parse_dates=['timestamp'])
+    print(f"Loaded {len(df)} rows.")
+
+    conn = mysql.connector.connect(**MYSQL_CONFIG)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
+                timestamp DATETIME NOT NULL,
+                open DOUBLE NOT NULL,
+                high DOUBLE NOT NULL,
+                low DOUBLE NOT NULL,
+                close DOUBLE NOT NULL,
+                volume BIGINT NOT NULL
+            )
+        ''')
+
+        insert_query = (f"INSERT INTO {TABLE_NAME} "
+                        "(timestamp, open, high, low, close, volume) "
+                        "VALUES (%s, %s, %s, %s, %s, %s)")
+
+        print(f"Inserting into '{TABLE_NAME}' in batches of {INSERT_BATCH_SIZE}...")
+        # Native Python values only: the connector's converter dispatches
+        # on exact type, and pandas.Timestamp / numpy scalars from
+        # itertuples fail with "cannot be converted to a MySQL type".
+        rows = zip(df['timestamp'].dt.to_pydatetime(),
+                   df['open'].tolist(), df['high'].tolist(),
+                   df['low'].tolist(), df['close'].tolist(),
+                   df['volume'].tolist())
+        inserted = 0
+        while True:
+            batch = list(itertools.islice(rows, INSERT_BATCH_SIZE))
+            if not batch:
+                break
+            cursor.executemany(insert_query, batch)
+            inserted += len(batch)
+        conn.commit()
+        print(f"Inserted {inserted} rows successfully.")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    load_data_to_mysql()
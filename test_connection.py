@@ -0,0 +1,13 @@
+import asyncio
+
+from ib_connection import get_ib
+
+
+async def main():
+    """Verifies that the shared IB client can connect to TWS."""
+    ib = await get_ib()
+    print(f"Connected. Server version: {ib.client.serverVersion()}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,14 +1,30 @@
 import asyncio
-import pandas as pd
+from contextlib import suppress
+import copy
+import csv
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+import numpy as np
 from ib_insync import *
 from datetime import datetime, timezone
+import atexit
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import signal
 import time
 import json
 import os
+import struct
 import sys
+
+try:
+    import orjson  # ~5-10x faster JSON encoding for the state snapshot
+except ImportError:
+    orjson = None
+
 from alpaca_data import get_tqqq_price
-from db_tqqq import initialize_database, create_buy_trade, update_trade_with_sell_order, close_trade, get_open_trades, get_trade_by_sell_order_id
+from db_tqqq import initialize_database, create_buy_trade, update_trade_with_sell_order, close_trade, get_open_trades, get_trades_by_sell_order_ids
 
 # --- 1. CONFIGURATION ---
 LOTS_CSV_FILE = 'tqqq_trading_strategy - lots.csv.csv'
@@ -20,39 +36,113 @@ PROFIT_TARGET_PERCENT = 1.01
 BUY_TRIGGER_PERCENT = 0.99
 POLL_INTERVAL_SEC = 20
 ORDER_TIMEOUT_SEC = 120
+PRICE_CACHE_TTL_SEC = 1.0
 L0_BUY_BUFFER = 1.0025
 FUTURE_BUY_QUEUE_DEPTH = 3
+STATE_SNAPSHOT_EVERY = 100  # fills between full JSON snapshots of the inventory
+STATE_FLUSH_DELAY_SEC = 0.1  # coalescing window before a snapshot write
+
+# One packed record per inventory event: level, quantity, sell_order_id,
+# purchase_price, op (add/remove). Precompiled once: pack() on a Struct
+# instance skips the per-call format-string parse of struct.pack in the
+# fill hot path.
+_STATE_EVENT_STRUCT = struct.Struct('<iiqdB')
+_STATE_OP_ADD = 1
+_STATE_OP_REMOVE = 2
 
 IB_HOST = '127.0.0.1'
 IB_PORT = 7497
 IB_CLIENT_ID = 101
 
+# Log records are enqueued (lock-free SimpleQueue) and formatted/written by
+# a background listener thread, so log calls in the async hot path never
+# block on file or console I/O.
+_log_queue = queue.SimpleQueue()
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s',
-                    handlers=[logging.FileHandler("log_tqqq_grid_bot.log", mode='a'),
-                              logging.StreamHandler()])
+                    handlers=[QueueHandler(_log_queue)])
+_log_listener = QueueListener(_log_queue,
+                              logging.FileHandler("log_tqqq_grid_bot.log", mode='a'),
+                              logging.StreamHandler(),
+                              respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 log = logging.getLogger()
 
-def show_critical_alert(title, message):
+# Integer percentage applied by the profit target (101 -> +1%); derived
+# once so the cents math below stays in lockstep with the float constant.
+_PROFIT_TARGET_PCT_INT = round(PROFIT_TARGET_PERCENT * 100)
+
+def _to_cents(price):
+    """Converts a float price to integer cents, rounding half up."""
+    return int(price * 100 + 0.5)
+
+@lru_cache(maxsize=2048)
+def _sell_target_price(purchase_price):
+    """
+    Computes the profit-target price for a purchase price.
+
+    The multiply and round happen in integer cents, so the result is pure
+    int arithmetic with no float rounding drift across chained
+    recomputations, and no slow generic round() path in the constructor.
+    Memoized: the grid revisits the same handful of prices constantly, and
+    the cache guarantees every call site sees the identical target for the
+    same input.
+    """
+    target_cents = (_to_cents(purchase_price) * _PROFIT_TARGET_PCT_INT + 50) // 100
+    return target_cents / 100.0
+
+@lru_cache(maxsize=2048)
+def _purchase_from_target(sell_target):
+    """Inverts _sell_target_price; used to recover the purchase price of a
+    lot reconstructed from an open SELL order's limit price."""
+    return round(sell_target / PROFIT_TARGET_PERCENT, 2)
+
+class _CriticalExit(Exception):
+    """Raised to unwind cleanly to main() for an orderly shutdown, instead
+    of sys.exit tearing through pending tasks with the IB socket open."""
+
+# Built once at import and shared by every critical alert, instead of
+# re-assembling the same instruction block inline at each call site.
+_RESET_PROCEDURE = f"""MANUAL RESET PROCEDURE:
+1. Manually close all open {SYMBOL} positions in TWS.
+2. Manually cancel all open {SYMBOL} orders in TWS.
+3. Delete the '{STATE_FILE}' file.
+4. Restart the bot (it will start safely from Level 0)."""
+
+def _log_critical_alert(title, message):
     log.critical("=" * 60)
     log.critical(f"CRITICAL ALERT: {title}")
     log.critical(message)
+    log.critical(_RESET_PROCEDURE)
     log.critical("The bot will now SHUT DOWN to prevent damage.")
     log.critical("=" * 60)
-    print('\a')
-    sys.exit(1)
+    sys.stderr.write('\a')
 
+def show_critical_alert(title, message):
+    _log_critical_alert(title, message)
+    raise _CriticalExit(title)
+
+@dataclass(slots=True)
 class Lot:
-    def __init__(self, level, quantity, purchase_price, sell_order_id=None, db_id=None):
-        self.level = int(level)
-        self.quantity = int(quantity)
-        self.purchase_price = float(purchase_price)
-        self.sell_target_price = round(float(purchase_price) * PROFIT_TARGET_PERCENT, 2)
-        self.sell_order_id = sell_order_id
-        self.db_id = db_id
+    # slots=True: no per-instance __dict__, which roughly halves the memory
+    # of the hot inventory collection and makes attribute access a fixed
+    # offset instead of a dict lookup.
+    level: int
+    quantity: int
+    purchase_price: float
+    sell_order_id: int = None
+    db_id: int = None
+    sell_target_price: float = field(init=False)
+
+    def __post_init__(self):
+        self.level = int(self.level)
+        self.quantity = int(self.quantity)
+        self.purchase_price = float(self.purchase_price)
+        self.sell_target_price = _sell_target_price(self.purchase_price)
 
     def to_dict(self):
-        return self.__dict__
+        return asdict(self)
 
     @staticmethod
     def from_dict(data):
@@ -67,57 +157,179 @@ class Lot:
 class GridBot:
     def __init__(self, lot_map_path, state_path):
         self.ib = IB()
-        self.lot_map = self.load_lot_map(lot_map_path)
+        self.load_lot_map(lot_map_path)
         self.state_path = state_path
         self.contract = None
-        self.lot_inventory = []
+        self._con_id = None
+        # Primary storage is keyed by a unique id (db_id, falling back to
+        # sell_order_id) because levels are NOT unique: reconciliation can
+        # produce several level -1 lots, which would overwrite each other
+        # in a level-keyed dict. The two secondary indexes -- by level
+        # (non-negative levels only) and by sell order id -- keep every
+        # hot-path read and removal O(1); no list scan survives.
+        self._lots = {}
+        self._lot_by_sell_id = {}
+        self._lot_by_level = {}
+        # Open LMT/LIT BUY orders for our contract, keyed by orderId and
+        # maintained from openOrder/orderStatus events so the queue refresh
+        # never rescans every open trade on the connection.
+        self._open_buy_trades = {}
         self.next_level = 0
         self.buy_reference_price = None
-        self.processing_lock = asyncio.Lock()
+        self._trigger_ladder = None
+        self._shutdown = asyncio.Event()
+        self._critical = None  # _CriticalExit carried out of the dispatcher
+        self._state_dirty = asyncio.Event()
+        # Fill events are queued and drained by a single dispatcher task, so
+        # processing is serialized structurally instead of with a lock.
+        self._events = asyncio.Queue()
         self.l0_buy_in_progress = False
+        self._state_log_fd = None
+        self._events_since_snapshot = 0
+        # Template for the conditional BUY orders; per call only the three
+        # varying fields are assigned on a shallow copy instead of building
+        # a fresh Order and setting every attribute again.
+        self._lit_template = Order(action='BUY', orderType='LIT', outsideRth=True)
+        self._price_cache_ts = 0.0
+        self._price_cache_val = None
+        self._price_fetch = None
         log.info("GridBot initialized.")
 
     def load_lot_map(self, path):
         try:
-            df = pd.read_csv(path, header=None, names=['level', 'shares_to_buy'])
-            log.info(f"CSV file '{path}' loaded with {len(df)} levels.")
-            return df
+            # Plain csv + numpy: the file is two integer columns, and not
+            # importing pandas saves ~500ms and ~60MB RSS at startup --
+            # which matters for crash-restart recovery latency.
+            with open(path, newline='') as f:
+                shares = [int(row[1]) for row in csv.reader(f) if row]
+            self.lot_map_shares = np.array(shares, dtype=np.int64)
+            self.qty_to_level = {int(q): level for level, q in enumerate(self.lot_map_shares)}
+            # Compounded trigger factors per level, built in one vectorized
+            # call, so any rebuild path is a single multiply instead of an
+            # O(level) loop.
+            self._trigger_pow = np.power(BUY_TRIGGER_PERCENT,
+                                         np.arange(self.lot_map_shares.size))
+            log.info(f"CSV file '{path}' loaded with {self.lot_map_shares.size} levels.")
         except Exception as e:
             log.error(f"Could not read CSV file '{path}': {e}")
             sys.exit(1)
 
+    @staticmethod
+    def _lot_key(lot):
+        return lot.db_id if lot.db_id is not None else lot.sell_order_id
+
+    def add_lot(self, lot):
+        """Adds a lot to the primary store and the secondary indexes."""
+        self._lots[self._lot_key(lot)] = lot
+        if lot.level >= 0:
+            self._lot_by_level[lot.level] = lot
+        if lot.sell_order_id is not None:
+            self._lot_by_sell_id[lot.sell_order_id] = lot
+
+    def remove_lot(self, lot):
+        """Removes a lot from the primary store and the secondary indexes."""
+        self._lots.pop(self._lot_key(lot), None)
+        if self._lot_by_level.get(lot.level) is lot:
+            del self._lot_by_level[lot.level]
+        if lot.sell_order_id is not None:
+            self._lot_by_sell_id.pop(lot.sell_order_id, None)
+
+    def record_state_event(self, lot, op):
+        """
+        Appends one packed inventory event to the binary state log.
+
+        One small os.write per fill replaces rewriting the whole JSON file
+        in the hot path; a full JSON snapshot is still taken every
+        STATE_SNAPSHOT_EVERY events (and on reconciliation) after which
+        the log is truncated.
+        """
+        try:
+            if self._state_log_fd is None:
+                self._state_log_fd = os.open(self.state_path + '.log',
+                                             os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            record = _STATE_EVENT_STRUCT.pack(lot.level, lot.quantity,
+                                              lot.sell_order_id or 0,
+                                              lot.purchase_price, op)
+            os.write(self._state_log_fd, record)
+        except Exception as e:
+            log.error(f"Could not append to state log '{self.state_path}.log': {e}")
+
+        self._events_since_snapshot += 1
+        if self._events_since_snapshot >= STATE_SNAPSHOT_EVERY:
+            self._state_dirty.set()
+
+    async def _state_flusher(self):
+        """
+        Coalesces snapshot requests: waits for the dirty flag, lets a burst
+        of fills settle for STATE_FLUSH_DELAY_SEC, then writes one snapshot
+        in a worker thread so the event loop never blocks on disk.
+        """
+        while not self._shutdown.is_set():
+            await self._state_dirty.wait()
+            await asyncio.sleep(STATE_FLUSH_DELAY_SEC)
+            self._state_dirty.clear()
+            await asyncio.to_thread(self.save_state)
+
     def save_state(self):
+        """Writes a full JSON snapshot of the inventory and truncates the event log.
+
+        The snapshot goes to a temp file first and is moved into place with
+        os.replace, so a crash mid-write can never leave a torn state file.
+        Compact encoding: the snapshot is a recovery artifact, not a report.
+        """
         try:
-            with open(self.state_path, 'w') as f:
-                json.dump([lot.to_dict() for lot in self.lot_inventory], f, indent=4)
+            snapshot = [lot.to_dict()
+                        for lot in sorted(self._lots.values(),
+                                          key=lambda l: l.level)]
+            if orjson is not None:
+                data = orjson.dumps(snapshot)
+            else:
+                data = json.dumps(snapshot, separators=(',', ':')).encode()
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+                # fsync before the rename: os.replace is only atomic for
+                # data already on disk, and this runs on a worker thread.
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.state_path)
+            if self._state_log_fd is not None:
+                os.ftruncate(self._state_log_fd, 0)
+            self._events_since_snapshot = 0
             log.info(f"State successfully saved to '{self.state_path}'.")
         except Exception as e:
             log.error(f"Critical error: Could not save state to '{self.state_path}': {e}")
 
-    def calculate_next_level(self):
-        if not self.lot_inventory:
-            return 0
-        open_levels = {lot.level for lot in self.lot_inventory}
-        return max(open_levels) + 1
+    def _rebuild_trigger_ladder(self):
+        """
+        Recomputes the geometric trigger ladder below the reference price.
+
+        One vectorized power/round per reference-price change; index i holds
+        the trigger for level next_level + i. Closed form, so no chained
+        multiply-and-round accumulating float noise down the ladder.
+        """
+        if self.buy_reference_price is None or self.buy_reference_price <= 0:
+            self._trigger_ladder = None
+            return
+        self._trigger_ladder = np.round(
+            self.buy_reference_price
+            * np.power(BUY_TRIGGER_PERCENT, np.arange(1, FUTURE_BUY_QUEUE_DEPTH + 1)),
+            2)
 
     def find_reference_price(self):
-        if not self.lot_inventory:
+        # One keyed max over the inventory, then a closed-form multiply
+        # via the precomputed trigger powers instead of an O(level) loop.
+        if not self._lots:
             return None
-        try:
-            highest_level_lot = max(self.lot_inventory, key=lambda lot: lot.level)
-            price = highest_level_lot.purchase_price
-
-            if highest_level_lot.level > 0:
-                l0_lot = next(lot for lot in self.lot_inventory if lot.level == 0)
-                ref_price = l0_lot.purchase_price
-                for _ in range(highest_level_lot.level):
-                    ref_price = ref_price * BUY_TRIGGER_PERCENT
-                price = ref_price
-
-            return round(price, 2)
-        except StopIteration:
+        highest_lot = max(self._lots.values(), key=lambda l: l.level)
+        if highest_lot.level <= 0:
+            # Level 0, or an orphan-only (-1) inventory after recovery:
+            # the reference is that lot's own purchase price.
+            return round(highest_lot.purchase_price, 2)
+        l0_lot = self._lot_by_level.get(0)
+        if l0_lot is None:
             log.warning("Could not find Level 0 lot to calculate reference price.")
             return None
+        return round(l0_lot.purchase_price * self._trigger_pow[highest_lot.level], 2)
 
     async def connect(self):
         try:
@@ -127,12 +339,37 @@ class GridBot:
             self.ib.reqMarketDataType(3)
             self.contract = Stock(SYMBOL, EXCHANGE, CURRENCY)
             await self.ib.qualifyContractsAsync(self.contract)
+            # Bare int for the per-event contract checks: the handlers fire
+            # on every fill/order event, and this drops two attribute loads
+            # from each comparison.
+            self._con_id = int(self.contract.conId)
+            self.ib.openOrderEvent += self._on_open_order
+            self.ib.orderStatusEvent += self._on_order_status
+            # Orders that were already open arrived during the connect
+            # sync, before the subscriptions above existed — seed the
+            # index from them or stale conditional BUYs from a previous
+            # run would never be found (and never cancelled).
+            for trade in self.ib.openTrades():
+                self._on_open_order(trade)
             log.info(f"Contract {SYMBOL} qualified.")
             return True
         except Exception as e:
             log.error(f"Connection failed: {e}")
             return False
 
+    def _on_open_order(self, trade):
+        """Indexes open conditional/limit BUY orders for our contract."""
+        order = trade.order
+        if (trade.contract.conId == self._con_id
+                and order.action == 'BUY'
+                and order.orderType in ('LMT', 'LIT')):
+            self._open_buy_trades[order.orderId] = trade
+
+    def _on_order_status(self, trade):
+        """Drops tracked BUY orders once they reach a terminal status."""
+        if trade.orderStatus.status in OrderStatus.DoneStates:
+            self._open_buy_trades.pop(trade.order.orderId, None)
+
     async def run(self):
         initialize_database()
         if not await self.connect():
@@ -144,25 +381,95 @@ class GridBot:
         # Start the real-time price logger as a background task
         asyncio.create_task(self.log_real_time_price())
 
+        # Shutdown is event-driven: a signal sets the flag and run() wakes
+        # immediately, instead of a polling loop that burned a wakeup every
+        # POLL_INTERVAL_SEC just to stay alive.
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            with suppress(NotImplementedError):
+                loop.add_signal_handler(sig, self._shutdown.set)
+        # A dropped TWS connection also ends the run instead of leaving the
+        # bot idling against a dead socket.
+        self.ib.disconnectedEvent += self._shutdown.set
+
+        heartbeat_task = asyncio.create_task(self._heartbeat())
+        flusher_task = asyncio.create_task(self._state_flusher())
+        dispatcher_task = asyncio.create_task(self._dispatcher())
+        if self.next_level == 0:
+            asyncio.create_task(self._l0_buy_loop())
+
         log.info("Subscribed to fill events. Bot started successfully. Monitoring...")
         try:
-            while True:
-                await self.trigger_l0_buy_if_needed()
-                log.info(f"Bot running... Open lots: {len(self.lot_inventory)}. Next level: {self.next_level}")
-                await asyncio.sleep(POLL_INTERVAL_SEC)
-        except (KeyboardInterrupt, SystemExit):
+            await self._shutdown.wait()
+            if self._critical is not None:
+                raise self._critical
             log.info("Manual stop received...")
         finally:
+            heartbeat_task.cancel()
+            flusher_task.cancel()
+            dispatcher_task.cancel()
+            if self._state_dirty.is_set():
+                self.save_state()  # don't lose a pending snapshot on the way out
             log.info("Disconnecting...")
             self.ib.disconnect()
             log.info("Bot disconnected.")
 
+    async def _heartbeat(self):
+        """Periodic status log; quiet while nothing changes, wakes early on shutdown."""
+        last_status = None
+        while not self._shutdown.is_set():
+            status = (len(self._lots), self.next_level)
+            if status != last_status:
+                log.info("Bot running... Open lots: %s. Next level: %s", status[0], status[1])
+                last_status = status
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._shutdown.wait(), POLL_INTERVAL_SEC)
+
+    async def _l0_buy_loop(self):
+        """
+        One-shot Level 0 task: retries the initial buy until it is under
+        way, then exits. Level 0 only matters until the first fill, so this
+        replaces a check that ran on every heartbeat for the lifetime of
+        the bot.
+        """
+        while (self.next_level == 0 and not self.l0_buy_in_progress
+               and not self._shutdown.is_set()):
+            await self.trigger_l0_buy_if_needed()
+            if self.next_level != 0 or self.l0_buy_in_progress:
+                return
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._shutdown.wait(), POLL_INTERVAL_SEC)
+
+    async def cached_price(self):
+        """
+        Returns the latest Alpaca price with a short TTL memo.
+
+        The price logger and the Level 0 trigger poll concurrently; callers
+        within the TTL share one response, and overlapping callers share a
+        single in-flight request. The blocking HTTP call runs in a thread so
+        it never stalls the event loop.
+        """
+        if time.monotonic() - self._price_cache_ts < PRICE_CACHE_TTL_SEC:
+            return self._price_cache_val
+        if self._price_fetch is None:
+            self._price_fetch = asyncio.ensure_future(asyncio.to_thread(get_tqqq_price))
+        fetch = self._price_fetch
+        try:
+            price = await asyncio.shield(fetch)
+        finally:
+            if self._price_fetch is fetch and fetch.done():
+                self._price_fetch = None
+        if price is not None:
+            self._price_cache_val = price
+            self._price_cache_ts = time.monotonic()
+        return price
+
     async def log_real_time_price(self):
         """Continuously fetches and logs the real-time price from Alpaca."""
         while True:
-            price = get_tqqq_price()
+            price = await self.cached_price()
             if price is not None:
-                log.info(f"REAL-TIME PRICE (Alpaca): ${price}")
+                log.info("REAL-TIME PRICE (Alpaca): $%s", price)
             else:
                 log.warning("Could not fetch real-time price from Alpaca.")
             await asyncio.sleep(5)  # Wait for 5 seconds
@@ -172,20 +479,21 @@ class GridBot:
         log.info("Initializing state from TWS and DB using self-healing logic...")
 
         # 1. Get data from IB
-        ib_open_sell_trades = [t for t in self.ib.openTrades() if t.contract.conId == self.contract.conId and t.order.action == 'SELL']
-        ib_portfolio_item = next((p for p in self.ib.portfolio() if p.contract.conId == self.contract.conId), None)
+        ib_open_sell_trades = [t for t in self.ib.openTrades() if t.contract.conId == self._con_id and t.order.action == 'SELL']
+        ib_portfolio_item = next((p for p in self.ib.portfolio() if p.contract.conId == self._con_id), None)
         total_position_qty = ib_portfolio_item.position if ib_portfolio_item else 0
 
         log.info(f"Found {len(ib_open_sell_trades)} open SELL orders in IB and a total position of {total_position_qty} shares.")
 
-        # 2. Populate DB with any lots that have open SELL orders but are not in the DB
-        qty_to_level_map = {v: k for k, v in self.lot_map.set_index('level')['shares_to_buy'].to_dict().items()}
+        # 2. Populate DB with any lots that have open SELL orders but are not in the DB.
+        # One batched IN query instead of one round-trip per open SELL order.
+        known_trades = get_trades_by_sell_order_ids(
+            [t.order.orderId for t in ib_open_sell_trades])
         for trade in ib_open_sell_trades:
-            existing_trade = get_trade_by_sell_order_id(trade.order.orderId)
-            if not existing_trade:
+            if trade.order.orderId not in known_trades:
                 log.info(f"Found open SELL order {trade.order.orderId} not in DB. Re-creating it.")
-                purchase_price = round(trade.order.lmtPrice / PROFIT_TARGET_PERCENT, 2)
-                level = qty_to_level_map.get(trade.order.totalQuantity, -1)
+                purchase_price = _purchase_from_target(trade.order.lmtPrice)
+                level = self.qty_to_level.get(int(trade.order.totalQuantity), -1)
                 db_id = create_buy_trade(
                     level=level,
                     buy_order_id=-trade.order.orderId,  # Use negative sell order ID for uniqueness
@@ -196,17 +504,21 @@ class GridBot:
                 if db_id:
                     update_trade_with_sell_order(db_id, trade.order.orderId)
 
-        # 3. Reconcile filled SELL orders
+        # 3. Reconcile filled SELL orders. The open-trades result is cached in
+        # a local and only re-fetched after a step that actually mutated it.
         db_open_trades = get_open_trades()
         ib_open_sell_order_ids = {t.order.orderId for t in ib_open_sell_trades}
+        closed_any = False
         for trade in db_open_trades:
             if trade['sell_order_id'] and trade['sell_order_id'] not in ib_open_sell_order_ids:
                 log.info(f"Trade with DB ID {trade['id']} (Sell OrderID {trade['sell_order_id']}) was likely filled while offline. Closing it.")
                 close_trade(trade['sell_order_id'], trade['buy_quantity'], 0, datetime.now(timezone.utc))
+                closed_any = True
 
         # 4. Reconcile orphan shares
-        final_db_open_trades = get_open_trades()
-        db_open_quantity = sum(trade['buy_quantity'] for trade in final_db_open_trades)
+        if closed_any:
+            db_open_trades = get_open_trades()
+        db_open_quantity = sum(trade['buy_quantity'] for trade in db_open_trades)
         orphan_quantity = total_position_qty - db_open_quantity
 
         if orphan_quantity > 0.1:
@@ -225,17 +537,19 @@ class GridBot:
                 orphan_lot.sell_order_id = sell_trade.order.orderId
                 update_trade_with_sell_order(db_id, orphan_lot.sell_order_id)
                 log.info(f"Placed SELL order {orphan_lot.sell_order_id} for orphan shares.")
+                db_open_trades = get_open_trades()
 
         # 5. Rebuild in-memory state from the now-reconciled database
         log.info("Rebuilding in-memory state from database...")
-        self.lot_inventory = []
-        final_open_trades = get_open_trades()
-        if not final_open_trades:
+        self._lots = {}
+        self._lot_by_sell_id = {}
+        self._lot_by_level = {}
+        if not db_open_trades:
             log.info("No open positions found after reconciliation. Ready for Level 0 buy.")
             self.next_level = 0
             self.buy_reference_price = None
         else:
-            for trade in final_open_trades:
+            for trade in db_open_trades:
                 lot = Lot(
                     level=trade['level'],
                     quantity=trade['buy_quantity'],
@@ -243,13 +557,18 @@ class GridBot:
                     sell_order_id=trade['sell_order_id'],
                     db_id=trade['id']
                 )
-                self.lot_inventory.append(lot)
+                self.add_lot(lot)
             
-            self.next_level = self.calculate_next_level()
+            # Invariant: next_level == max(open grid levels) + 1. It is set
+            # once here and maintained incrementally by the BUY fill path;
+            # an orphan-only (-1) inventory starts back at level 0.
+            self.next_level = (max(self._lot_by_level) + 1
+                               if self._lot_by_level else 0)
             self.buy_reference_price = self.find_reference_price()
-            log.info(f"Rebuilt {len(self.lot_inventory)} lots from database.")
+            log.info(f"Rebuilt {len(self._lots)} lots from database.")
+        self._rebuild_trigger_ladder()
 
-        self.save_state()
+        await asyncio.to_thread(self.save_state)
         log.info(f"Inventory successfully reconstructed. Next level: {self.next_level}. Ref price: {self.buy_reference_price}")
         log.info("Setting up BUY queue...")
         await self.place_future_buy_queue()
@@ -258,7 +577,7 @@ class GridBot:
     async def trigger_l0_buy_if_needed(self):
         if self.next_level == 0 and not self.l0_buy_in_progress:
             log.info("Attempting to fetch TQQQ price from Alpaca for Level 0 buy...")
-            price = get_tqqq_price()
+            price = await self.cached_price()
             if price is not None and price > 0:
                 log.info(f"Successfully fetched price from Alpaca: {price}")
                 self.l0_buy_in_progress = True
@@ -267,156 +586,249 @@ class GridBot:
                 log.warning("Could not fetch valid price from Alpaca. Will retry.")
 
     async def execute_buy_level_0(self, current_price):
-        async with self.processing_lock:
-            if self.next_level != 0:
-                log.warning("execute_buy_level_0 called, but next_level is not 0. Ignoring.")
-                return
-            log.info(f"Placing first buy (Level 0) at market price: {current_price}")
-            quantity = int(self.lot_map.iloc[0]['shares_to_buy'])
-            limit_price = round(current_price * L0_BUY_BUFFER, 2)
+        # l0_buy_in_progress single-flights this path; the resulting fill is
+        # processed independently by the dispatcher while we wait here.
+        if self.next_level != 0:
+            log.warning("execute_buy_level_0 called, but next_level is not 0. Ignoring.")
+            return
+        log.info(f"Placing first buy (Level 0) at market price: {current_price}")
+        quantity = int(self.lot_map_shares[0])
+        limit_price = round(current_price * L0_BUY_BUFFER, 2)
+        filled = False
+        try:
             trade = await self.place_and_monitor_order("BUY", quantity, limit_price)
-            if trade and trade.orderStatus.status == 'Filled':
+            filled = bool(trade and trade.orderStatus.status == 'Filled')
+            if filled:
                 log.info(f"Level 0 Buy order (Id: {trade.order.orderId}) confirmed as Filled.")
             else:
                 log.warning(f"Level 0 Buy order failed or was cancelled. Status: {trade.orderStatus.status if trade else 'Unknown'}.")
+        finally:
+            # Clear the single-flight flag on any non-filled outcome --
+            # including an exception -- so the L0 task can retry; on success
+            # it stays set and the task exits for good.
+            if not filled:
                 self.l0_buy_in_progress = False
 
-    async def on_fill(self, trade: Trade, fill: Fill):
-        if fill.contract.conId != self.contract.conId:
+    def on_fill(self, trade: Trade, fill: Fill):
+        """Fill-event producer: filters by contract and enqueues for the
+        dispatcher. Serialization is structural -- one worker consumes the
+        queue in arrival order, so no lock and no contention are possible."""
+        if fill.contract.conId != self._con_id:
             return
-        async with self.processing_lock:
-            action = fill.execution.side
-            orderId = fill.execution.orderId
-            log.info(f"--- FILL RECEIVED: {action} order {orderId} ---")
-            if action == "BOT":
-                if any(lot.level == self.next_level for lot in self.lot_inventory):
-                    log.warning(f"Ignoring duplicate BUY fill for Level {self.next_level}.")
-                    return
-                
-                # Record the BUY trade in the database FIRST
-                level = self.next_level
-                db_id = create_buy_trade(
-                    level=level,
-                    buy_order_id=orderId,
-                    quantity=fill.execution.shares,
-                    price=fill.execution.avgPrice,
-                    timestamp=fill.time
+        self._events.put_nowait((trade, fill))
+
+    async def _dispatcher(self):
+        """Single worker draining the fill queue in arrival order."""
+        while True:
+            trade, fill = await self._events.get()
+            try:
+                await self._process_fill(trade, fill)
+            except _CriticalExit as e:
+                # A critical alert raised from a fill path must stop the
+                # bot, not get logged away as a per-fill error: carry it to
+                # run() and trigger the shutdown.
+                self._critical = e
+                self._shutdown.set()
+                raise
+            except Exception as e:
+                log.error("Error processing fill for order %s: %s", fill.execution.orderId, e, exc_info=True)
+
+    async def _process_fill(self, trade: Trade, fill: Fill):
+        action = fill.execution.side
+        orderId = fill.execution.orderId
+        log.info("--- FILL RECEIVED: %s order %s ---", action, orderId)
+        if action == "BOT":
+            if self.next_level in self._lot_by_level:
+                log.warning("Ignoring duplicate BUY fill for Level %s.", self.next_level)
+                return
+
+            # Record the BUY trade in the database FIRST
+            level = self.next_level
+            db_id = create_buy_trade(
+                level=level,
+                buy_order_id=orderId,
+                quantity=fill.execution.shares,
+                price=fill.execution.avgPrice,
+                timestamp=fill.time
+            )
+            if db_id is None:
+                log.error("Failed to record BUY trade for order %s in the database. Aborting further action for this fill.", orderId)
+                return
+
+            new_lot = Lot(level, fill.execution.shares, fill.execution.avgPrice, db_id=db_id)
+
+            sell_trade = await self.place_sell_order(new_lot)
+            new_lot.sell_order_id = sell_trade.order.orderId
+
+            # Update the trade record in the DB with the sell_order_id
+            update_trade_with_sell_order(new_lot.db_id, new_lot.sell_order_id)
+
+            self.add_lot(new_lot)
+            self.record_state_event(new_lot, _STATE_OP_ADD)
+            self.buy_reference_price = new_lot.purchase_price if level == 0 else round(self.buy_reference_price * BUY_TRIGGER_PERCENT, 2)
+            self.next_level += 1
+            self._rebuild_trigger_ladder()
+            log.info("State updated. New next_level: %s. New ref_price: %s", self.next_level, self.buy_reference_price)
+            await self.place_future_buy_queue(filledOrderId=orderId)
+        elif action == "SLD":
+            # A sell order was filled. Find the corresponding lot and remove it.
+            lot_to_remove = self._lot_by_sell_id.get(orderId)
+            if lot_to_remove:
+                self.remove_lot(lot_to_remove)
+                self.record_state_event(lot_to_remove, _STATE_OP_REMOVE)
+                log.info("Sell for Level %s confirmed. Lot removed from inventory.", lot_to_remove.level)
+
+                # Mark the trade as CLOSED in the database
+                close_trade(
+                    sell_order_id=orderId,
+                    sell_quantity=fill.execution.shares,
+                    sell_price=fill.execution.avgPrice,
+                    sell_timestamp=fill.time
                 )
-                if db_id is None:
-                    log.error(f"Failed to record BUY trade for order {orderId} in the database. Aborting further action for this fill.")
-                    return
-
-                level = self.next_level
-                new_lot = Lot(level, fill.execution.shares, fill.execution.avgPrice, db_id=db_id)
-                
-                sell_trade = await self.place_sell_order(new_lot)
-                new_lot.sell_order_id = sell_trade.order.orderId
-                
-                # Update the trade record in the DB with the sell_order_id
-                update_trade_with_sell_order(new_lot.db_id, new_lot.sell_order_id)
-
-                self.lot_inventory.append(new_lot)
-                self.save_state()
-                self.buy_reference_price = new_lot.purchase_price if level == 0 else round(self.buy_reference_price * BUY_TRIGGER_PERCENT, 2)
-                self.next_level += 1
-                log.info(f"State updated. New next_level: {self.next_level}. New ref_price: {self.buy_reference_price}")
-                await self.place_future_buy_queue(filledOrderId=orderId)
-            elif action == "SLD":
-                # A sell order was filled. Find the corresponding lot and remove it.
-                lot_to_remove = next((lot for lot in self.lot_inventory if lot.sell_order_id == orderId), None)
-                if lot_to_remove:
-                    self.lot_inventory.remove(lot_to_remove)
-                    self.save_state()
-                    log.info(f"Sell for Level {lot_to_remove.level} confirmed. Lot removed from inventory.")
-                    
-                    # Mark the trade as CLOSED in the database
-                    close_trade(
-                        sell_order_id=orderId,
-                        sell_quantity=fill.execution.shares,
-                        sell_price=fill.execution.avgPrice,
-                        sell_timestamp=fill.time
-                    )
-                else:
-                    log.warning(f"Received SELL fill for OrderId {orderId}, but no matching lot found in memory!")
-            log.info("--- FILL PROCESSING COMPLETE ---")
+            else:
+                log.warning("Received SELL fill for OrderId %s, but no matching lot found in memory!", orderId)
+        log.info("--- FILL PROCESSING COMPLETE ---")
 
     async def place_sell_order(self, lot: Lot):
-        log.info(f"Placing GTC SELL Limit for Lvl {lot.level}: {lot.quantity} @ {lot.sell_target_price}")
+        log.info("Placing GTC SELL Limit for Lvl %s: %s @ %s", lot.level, lot.quantity, lot.sell_target_price)
         order = LimitOrder('SELL', lot.quantity, lot.sell_target_price, tif='GTC', outsideRth=True)
         return self.ib.placeOrder(self.contract, order)
 
     async def place_future_buy_queue(self, filledOrderId=None):
-        log.info("Placing/Updating next {FUTURE_BUY_QUEUE_DEPTH} conditional BUY orders...")
+        log.info("Placing/Updating next %s conditional BUY orders...", FUTURE_BUY_QUEUE_DEPTH)
 
-        # Use the more reliable ib.openTrades() to find orders to cancel
-        # This list is populated by ib_insync from openOrder events
-        open_trades = self.ib.openTrades()
-        for trade in open_trades:
+        # The incrementally-maintained index already holds exactly our open
+        # LMT/LIT BUY orders, so no full openTrades() rebuild and rescan.
+        to_cancel = []
+        for trade in list(self._open_buy_trades.values()):
             # Skip the order that was just filled to prevent a race condition
             if trade.order.orderId == filledOrderId:
                 continue
+            log.warning("Cancelling old BUY order (Id: %s, Type: %s).", trade.order.orderId, trade.order.orderType)
+            to_cancel.append(trade)
+
+        # Cancel in parallel and proceed the moment TWS acks, instead of the
+        # old fixed 500ms sleep; the timeout is only a safety net.
+        if to_cancel:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(self._await_cancel(trade) for trade in to_cancel),
+                                   return_exceptions=True),
+                    timeout=2.0)
+            except asyncio.TimeoutError:
+                log.warning("Timed out waiting for BUY cancellation acks. Proceeding.")
+
+        if self._trigger_ladder is None:
+            log.error(f"Cannot place future orders: Invalid reference price ({self.buy_reference_price}).")
+            return
 
-            # Cancel any other open BUY orders for this symbol that are LMT or LIT
-            if trade.contract.conId == self.contract.conId and trade.order.action == 'BUY' and trade.order.orderType in ('LMT', 'LIT'):
-                log.warning(f"Cancelling old BUY order (Id: {trade.order.orderId}, Type: {trade.order.orderType}).")
-                self.ib.cancelOrder(trade.order)
-
-        await asyncio.sleep(0.5)
-
-        current_trigger_price = self.buy_reference_price
+        # The trigger prices were computed in one vectorized shot when the
+        # reference price last changed; here we only index into the ladder.
+        queue = []
         for i in range(FUTURE_BUY_QUEUE_DEPTH):
             level_to_queue = self.next_level + i
-            if level_to_queue >= len(self.lot_map):
+            if level_to_queue >= self.lot_map_shares.size:
                 log.info("Reached end of lot map.")
                 break
-            if current_trigger_price is None or current_trigger_price <= 0:
-                log.error(f"Cannot place future orders: Invalid reference price ({current_trigger_price}).")
-                return
-
-            trigger_price = round(current_trigger_price * BUY_TRIGGER_PERCENT, 2)
-            quantity = int(self.lot_map.iloc[level_to_queue]['shares_to_buy'])
-            log.info(f"Placing conditional BUY for Lvl {level_to_queue}: {quantity} shares, Trigger @ {trigger_price}")
+            queue.append((level_to_queue, int(self.lot_map_shares[level_to_queue]),
+                          float(self._trigger_ladder[i])))
+
+        # Every order transmits: TWS only auto-sends held transmit=False
+        # orders that are chained via parentId (bracket orders); independent
+        # LIT orders would just sit untransmitted. placeOrder doesn't await
+        # acks, so the queue still goes out back-to-back on one socket.
+        for level_to_queue, quantity, trigger_price in queue:
+            log.info("Placing conditional BUY for Lvl %s: %s shares, Trigger @ %s", level_to_queue, quantity, trigger_price)
             await self.place_conditional_buy(quantity, trigger_price)
-            current_trigger_price = trigger_price
+
+    async def _await_cancel(self, trade):
+        """Requests cancellation of a trade and waits for the TWS ack."""
+        fut = asyncio.get_running_loop().create_future()
+
+        def _done(*_):
+            if not fut.done():
+                fut.set_result(None)
+
+        # filledEvent too: the order may fill before the cancel lands.
+        trade.cancelledEvent += _done
+        trade.filledEvent += _done
+        try:
+            self.ib.cancelOrder(trade.order)
+            await fut
+        finally:
+            trade.cancelledEvent -= _done
+            trade.filledEvent -= _done
 
     async def place_conditional_buy(self, quantity, trigger_price):
         # Using a Limit-if-Touched (LIT) order for robust conditional execution.
-        order = Order()
-        order.action = 'BUY'
-        order.orderType = 'LIT'
+        order = copy.copy(self._lit_template)
         order.totalQuantity = quantity
         order.lmtPrice = trigger_price
         order.auxPrice = trigger_price
-        order.outsideRth = True
-        order.transmit = True
 
-        self.ib.placeOrder(self.contract, order)
+        return self.ib.placeOrder(self.contract, order)
+
+    @staticmethod
+    async def _await_done(trade):
+        """Waits for a trade to reach a done state, driven by TWS events."""
+        fut = asyncio.get_running_loop().create_future()
+
+        def _done(*_):
+            if trade.orderStatus.status in OrderStatus.DoneStates and not fut.done():
+                fut.set_result(trade)
+
+        trade.statusEvent += _done
+        trade.filledEvent += _done
+        trade.cancelledEvent += _done
+        try:
+            _done()  # the order may already be done before we subscribed
+            return await fut
+        finally:
+            trade.statusEvent -= _done
+            trade.filledEvent -= _done
+            trade.cancelledEvent -= _done
 
     async def place_and_monitor_order(self, action, quantity, limit_price):
         order = LimitOrder(action, quantity, limit_price, outsideRth=True)
         trade = self.ib.placeOrder(self.contract, order)
         log.info(f"Order {action} {quantity} {SYMBOL} LMT @ {limit_price} submitted (Id: {trade.order.orderId}). Waiting for fill...")
-        start_time = time.time()
-        while trade.orderStatus.status not in OrderStatus.DoneStates:
-            await asyncio.sleep(2)
-            if time.time() - start_time > ORDER_TIMEOUT_SEC:
-                log.error(f"Order {trade.order.orderId} TIMEOUT. Cancelling.")
-                self.ib.cancelOrder(trade.order)
-                return None
-            log.info(f"Order {trade.order.orderId} pending... Status: {trade.orderStatus.status}")
+        # Event-driven wait: the status events wake us the moment TWS acks,
+        # instead of a 2-second poll that adds up to a second of latency per
+        # fill and a log line per wakeup.
+        try:
+            await asyncio.wait_for(self._await_done(trade), timeout=ORDER_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            log.error(f"Order {trade.order.orderId} TIMEOUT. Cancelling.")
+            self.ib.cancelOrder(trade.order)
+            return None
         log.info(f"Order {trade.order.orderId} finished. Final Status: {trade.orderStatus.status}")
         return trade
 
 async def main():
     bot = GridBot(LOTS_CSV_FILE, STATE_FILE)
-    await bot.run()
+    try:
+        await bot.run()
+    except _CriticalExit as e:
+        log.critical(f"Shutting down after critical alert: {e}")
+        if bot.ib.isConnected():
+            bot.ib.disconnect()
+        sys.exit(1)
 
 if __name__ == "__main__":
+    try:
+        # libuv event loop: drop-in replacement, noticeably faster on the
+        # socket-heavy TWS traffic. Falls through to the stdlib loop where
+        # uvloop is not installed (e.g. Windows).
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
     try:
         asyncio.run(main())
-    except (KeyboardInterrupt, SystemExit):
+    except KeyboardInterrupt:
         log.info("Program terminated.")
     except Exception as e:
         log.critical(f"Unhandled critical exception: {e}", exc_info=True)
-        show_critical_alert("Unhandled Exception", f"Bot crashed:\\n\\n{e}")
+        _log_critical_alert("UNHANDLED EXCEPTION", str(e))
+        sys.exit(1)
 
@@ -0,0 +1,433 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# --- CONFIGURATION ---
+SYNTHETIC_DB_FILE = 'tqqq_synthetic_data.sqlite'
+SYNTHETIC_TABLE_NAME = 'minute_bars'
+LOTS_CSV_FILE = 'tqqq_trading_strategy - lots.csv.csv'
+INITIAL_CAPITAL = 1_000_000.0
+PROFIT_TARGET_PERCENT = 1.01
+BUY_TRIGGER_PERCENT = 0.99
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _unrealized_pnl(final_price, lot_prices, lot_qty, head, tail):
+        # Scalar accumulation over the live slice; fastmath lets LLVM
+        # auto-vectorize the loop into packed FMAs.
+        s = 0.0
+        for i in range(head, tail):
+            s += (final_price - lot_prices[i]) * lot_qty[i]
+        return s
+
+    @njit(cache=True, fastmath=True)
+    def _simulate_both_njit(prices, block_min, block_max, lot_shares,
+                            initial_cash, lot_prices, lot_qty):
+        # The trigger percents are read from the module globals below:
+        # numba freezes globals at compile time, so LLVM folds the 0.99 /
+        # 1.01 multiplies into immediates instead of loading arguments.
+        profit_target = PROFIT_TARGET_PERCENT
+        buy_trigger = BUY_TRIGGER_PERCENT
+        # Both portfolios fused into one pass over the price array. The
+        # trade decisions depend only on price, reference and open lots,
+        # which are identical for US and CA — only the PnL accounting
+        # differs — so one state machine carries a per-lot (US, FIFO)
+        # accumulator and an adjusted-cost-base (CA) accumulator while
+        # prices stream from RAM once. Open lots live in a preallocated
+        # ring buffer (head/tail cursors), so there is no allocation or
+        # O(n) pop inside.
+        cap = lot_shares.shape[0]
+        cash = initial_cash
+        shares = 0
+        us_realized = 0.0
+        ca_realized = 0.0
+        total_cost = 0  # adjusted cost base in integer cents, no FP drift
+        trade_count = 0
+        ref = -1.0
+        next_level = 0
+        head = 0
+        tail = 0
+        n = prices.shape[0]
+        n_blocks = block_min.shape[0]
+        i = 0
+        while i < n:
+            # On a 1024-bar block boundary, skip the whole block when its
+            # [min, max] range cannot cross either active trigger.
+            if (i & 1023) == 0:
+                b = i >> 10
+                if b < n_blocks and ref >= 0.0:
+                    buy_thresh = ref * buy_trigger
+                    if head == tail:
+                        if block_min[b] > buy_thresh:
+                            i += 1024
+                            continue
+                    else:
+                        sell_thresh = lot_prices[head % cap] * profit_target
+                        if (block_max[b] < sell_thresh
+                                and (next_level >= cap
+                                     or block_min[b] > buy_thresh)):
+                            i += 1024
+                            continue
+            price = prices[i]
+            # Single fused branch per bar: a sell resets ref to price, so a
+            # same-bar buy (price <= ref * buy_trigger) can never follow it
+            # and the two legs are mutually exclusive.
+            if head < tail and price >= lot_prices[head % cap] * profit_target:
+                j = head % cap
+                qty = lot_qty[j]
+                cash += price * qty
+                us_realized += (price - lot_prices[j]) * qty
+                remaining_cost = (total_cost * (shares - qty)) // shares
+                ca_realized += price * qty - (total_cost - remaining_cost) / 100.0
+                total_cost = remaining_cost
+                shares -= qty
+                head += 1
+                if next_level > 0:
+                    next_level -= 1
+                ref = price
+                trade_count += 1
+            elif (ref < 0.0 or price <= ref * buy_trigger) and next_level < cap:
+                qty = lot_shares[next_level]
+                cost = price * qty
+                if qty > 0 and cost <= cash:
+                    j = tail % cap
+                    lot_prices[j] = price
+                    lot_qty[j] = qty
+                    tail += 1
+                    cash -= cost
+                    total_cost += int(price * 100.0 + 0.5) * qty
+                    shares += qty
+                    next_level += 1
+                    ref = price
+                    trade_count += 1
+            i += 1
+        return (cash, shares, us_realized, ca_realized, total_cost,
+                trade_count, head, tail)
+
+    @njit(cache=True, parallel=True, fastmath=True)
+    def _simulate_batch(prices, lot_shares, buy_triggers, profit_targets,
+                        initial_cash):
+        # Parameter sweep: K independent (buy_trigger, profit_target)
+        # portfolios advanced in one pass, one grid point per prange
+        # worker, so the price array is streamed from RAM once instead of
+        # re-running the whole simulation K times.
+        K = buy_triggers.shape[0]
+        cap = lot_shares.shape[0]
+        n = prices.shape[0]
+        out_cash = np.empty(K, np.float64)
+        out_shares = np.empty(K, np.int64)
+        out_realized = np.empty(K, np.float64)
+        out_trades = np.empty(K, np.int64)
+        lot_prices = np.empty((K, cap), np.float64)
+        lot_qty = np.empty((K, cap), np.int64)
+        for k in prange(K):
+            buy_trigger = buy_triggers[k]
+            profit_target = profit_targets[k]
+            cash = initial_cash
+            shares = 0
+            realized = 0.0
+            trade_count = 0
+            ref = -1.0
+            next_level = 0
+            head = 0
+            tail = 0
+            for i in range(n):
+                price = prices[i]
+                if (head < tail
+                        and price >= lot_prices[k, head % cap] * profit_target):
+                    j = head % cap
+                    qty = lot_qty[k, j]
+                    cash += price * qty
+                    realized += (price - lot_prices[k, j]) * qty
+                    shares -= qty
+                    head += 1
+                    if next_level > 0:
+                        next_level -= 1
+                    ref = price
+                    trade_count += 1
+                elif ((ref < 0.0 or price <= ref * buy_trigger)
+                        and next_level < cap):
+                    qty = lot_shares[next_level]
+                    cost = price * qty
+                    if qty > 0 and cost <= cash:
+                        j = tail % cap
+                        lot_prices[k, j] = price
+                        lot_qty[k, j] = qty
+                        tail += 1
+                        cash -= cost
+                        shares += qty
+                        next_level += 1
+                        ref = price
+                        trade_count += 1
+            out_cash[k] = cash
+            out_shares[k] = shares
+            out_realized[k] = realized
+            out_trades[k] = trade_count
+        return out_cash, out_shares, out_realized, out_trades
+
+
+class Portfolio:
+    """Base portfolio: cash, share count and realized PnL bookkeeping."""
+
+    # No per-instance __dict__: attribute reads on every bar become fixed
+    # slot offsets instead of a hash lookup plus a pointer chase.
+    __slots__ = ('name', 'lot_shares', 'num_levels', 'initial_capital',
+                 'cash', 'shares', 'total_realized_pnl', 'trade_count',
+                 'capacity', 'lot_prices', 'lot_qty', 'head', 'tail',
+                 'next_buy_level', 'current_reference_price')
+
+    def __init__(self, name, lot_map_df, initial_capital):
+        self.name = name
+        # Plain int64 array: iloc would build a Series per lookup, and
+        # this lookup runs on every buy.
+        self.lot_shares = lot_map_df['shares_to_buy'].to_numpy(np.int64)
+        self.num_levels = self.lot_shares.shape[0]
+        self.initial_capital = initial_capital
+        self.cash = initial_capital
+        self.shares = 0
+        self.total_realized_pnl = 0.0
+        self.trade_count = 0
+        # Struct-of-arrays ring buffer for open lots: no dict per buy and
+        # O(1) FIFO pop (cursor bump) instead of list.pop(0) shifting.
+        self.capacity = len(lot_map_df)
+        self.lot_prices = np.empty(self.capacity, np.float64)
+        self.lot_qty = np.empty(self.capacity, np.int64)
+        self.head = 0
+        self.tail = 0
+        self.next_buy_level = 0
+        self.current_reference_price = None
+
+    def get_shares_for_level(self, level):
+        return int(self.lot_shares[level]) if level < self.num_levels else 0
+
+    def attempt_buy(self, price):
+        """Buys the next grid level when the price reaches its trigger."""
+        if self.current_reference_price is None:
+            trigger = price  # first bar seeds Level 0
+        else:
+            trigger = self.current_reference_price * BUY_TRIGGER_PERCENT
+        if price <= trigger:
+            quantity = self.get_shares_for_level(self.next_buy_level)
+            if quantity == 0:
+                return
+            cost = price * quantity
+            if cost > self.cash:
+                return
+            self.cash -= cost
+            self.shares += quantity
+            self._record_buy(price, quantity)
+            if self.tail == self.capacity:
+                # Compact the live region back to the front (amortized; at
+                # most num_levels lots are ever open) so head:tail stays a
+                # plain contiguous slice.
+                count = self.tail - self.head
+                self.lot_prices[:count] = self.lot_prices[self.head:self.tail]
+                self.lot_qty[:count] = self.lot_qty[self.head:self.tail]
+                self.head = 0
+                self.tail = count
+            self.lot_prices[self.tail] = price
+            self.lot_qty[self.tail] = quantity
+            self.tail += 1
+            self.next_buy_level += 1
+            self.current_reference_price = price
+            self.trade_count += 1
+
+    def attempt_sell(self, price):
+        """Sells the oldest open lot once it reaches its profit target."""
+        if self.head == self.tail:
+            return
+        buy_price = self.lot_prices[self.head]
+        if price >= buy_price * PROFIT_TARGET_PERCENT:
+            quantity = int(self.lot_qty[self.head])
+            self.head += 1
+            self.cash += price * quantity
+            self.total_realized_pnl += self._realize_pnl(price, buy_price,
+                                                         quantity)
+            self.shares -= quantity
+            self.next_buy_level = max(self.next_buy_level - 1, 0)
+            self.current_reference_price = price
+            self.trade_count += 1
+
+    def _record_buy(self, price, quantity):
+        pass
+
+    def _realize_pnl(self, price, buy_price, quantity):
+        raise NotImplementedError
+
+    def _compute_unrealized_pnl(self, final_price):
+        raise NotImplementedError
+
+    def calculate_final_value(self, final_price):
+        """Returns (total value, unrealized PnL) at the final price."""
+        unrealized_pnl = (self._compute_unrealized_pnl(final_price)
+                          if self.shares > 0 else 0.0)
+        return self.cash + self.shares * final_price, unrealized_pnl
+
+
+class USPortfolio(Portfolio):
+    """US accounting: each lot keeps its own cost basis (FIFO disposal)."""
+
+    __slots__ = ()
+
+    def _realize_pnl(self, price, buy_price, quantity):
+        return (price - buy_price) * quantity
+
+    def _compute_unrealized_pnl(self, final_price):
+        if NUMBA_AVAILABLE:
+            return _unrealized_pnl(final_price, self.lot_prices,
+                                   self.lot_qty, self.head, self.tail)
+        # One fused NumPy reduction over the live slice instead of a
+        # Python-level accumulation loop.
+        slc_p = self.lot_prices[self.head:self.tail]
+        slc_q = self.lot_qty[self.head:self.tail]
+        return float(np.dot(slc_q, final_price - slc_p))
+
+
+class CanadianPortfolio(Portfolio):
+    """Canadian accounting: adjusted cost base averaged over all shares.
+
+    The cost base is kept in integer cents: exact integer arithmetic
+    instead of float subtract-a-fraction per sale, so no rounding drift
+    accumulates over thousands of trades.
+    """
+
+    __slots__ = ('total_cost',)
+
+    def __init__(self, name, lot_map_df, initial_capital):
+        super().__init__(name, lot_map_df, initial_capital)
+        self.total_cost = 0  # int64 cents
+
+    def _record_buy(self, price, quantity):
+        self.total_cost += round(price * 100) * quantity
+
+    def _realize_pnl(self, price, buy_price, quantity):
+        # Every open lot was funded from cash at buy time, so shares >=
+        # quantity always holds here; no defensive branch needed.
+        remaining_cost = (self.total_cost
+                          * (self.shares - quantity)) // self.shares
+        cost_of_sold = self.total_cost - remaining_cost
+        self.total_cost = remaining_cost
+        return price * quantity - cost_of_sold / 100.0
+
+    def _compute_unrealized_pnl(self, final_price):
+        return final_price * self.shares - self.total_cost / 100.0
+
+
+def _connect_readonly(db_path):
+    """Opens a SQLite connection tuned for a large sequential read."""
+    conn = sqlite3.connect(db_path)
+    # query_only also skips journal/locking write paths; the mmap and the
+    # enlarged page cache keep the ordered scan off syscalls and page
+    # faults, and temp_store=MEMORY keeps any sort spill off disk.
+    conn.execute("PRAGMA query_only=1")
+    conn.execute("PRAGMA mmap_size=1073741824")
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def load_synthetic_data():
+    """Loads the synthetic close series as a float64 ndarray."""
+    print(f"Loading synthetic bars from '{SYNTHETIC_DB_FILE}'...")
+    conn = _connect_readonly(SYNTHETIC_DB_FILE)
+    # Only the close column is simulated; pulling every column through
+    # pd.read_sql_query built a DataFrame just to throw most of it away.
+    cur = conn.execute(
+        f"SELECT close FROM {SYNTHETIC_TABLE_NAME} ORDER BY timestamp")
+    prices = np.fromiter((row[0] for row in cur), dtype=np.float64)
+    conn.close()
+    print(f"Loaded {prices.shape[0]} bars.")
+    return prices
+
+
+def run_simulation():
+    """Runs the grid strategy over the synthetic series for both portfolios."""
+    lot_map_df = pd.read_csv(LOTS_CSV_FILE, header=None,
+                             names=['level', 'shares_to_buy'])
+    prices = load_synthetic_data()
+
+    us_portfolio = USPortfolio('US (FIFO)', lot_map_df, INITIAL_CAPITAL)
+    ca_portfolio = CanadianPortfolio('Canada (average cost)', lot_map_df,
+                                     INITIAL_CAPITAL)
+
+    print(f"Simulating {prices.shape[0]} bars...")
+    if NUMBA_AVAILABLE:
+        # One JIT'd pass advances both portfolios (they trade identically;
+        # only the PnL accounting differs), so the price array is streamed
+        # from RAM once. First call compiles, cache=True amortizes that.
+        lot_shares = us_portfolio.lot_shares
+        lot_prices = np.empty(lot_shares.shape[0], np.float64)
+        lot_qty = np.empty(lot_shares.shape[0], np.int64)
+        # Per-1024-bar extrema let the kernel hop over stretches that can't
+        # touch either trigger; the ragged tail is simply never skipped.
+        n_blocks = prices.shape[0] // 1024
+        blocks = prices[:n_blocks * 1024].reshape(-1, 1024)
+        block_min = blocks.min(axis=1)
+        block_max = blocks.max(axis=1)
+        (cash, shares, us_realized, ca_realized, total_cost, trades,
+         head, tail) = _simulate_both_njit(
+            prices, block_min, block_max, lot_shares, INITIAL_CAPITAL,
+            lot_prices, lot_qty)
+        for portfolio in (us_portfolio, ca_portfolio):
+            portfolio.cash = cash
+            portfolio.shares = int(shares)
+            portfolio.trade_count = int(trades)
+        us_portfolio.total_realized_pnl = us_realized
+        ca_portfolio.total_realized_pnl = ca_realized
+        ca_portfolio.total_cost = total_cost
+        cap = lot_shares.shape[0]
+        count = tail - head
+        for k in range(count):
+            us_portfolio.lot_prices[k] = lot_prices[(head + k) % cap]
+            us_portfolio.lot_qty[k] = lot_qty[(head + k) % cap]
+        us_portfolio.head = 0
+        us_portfolio.tail = count
+    else:
+        for i in range(prices.shape[0]):
+            price = prices[i]
+            us_portfolio.attempt_sell(price)
+            us_portfolio.attempt_buy(price)
+            ca_portfolio.attempt_sell(price)
+            ca_portfolio.attempt_buy(price)
+
+    final_price = float(prices[-1])
+    for portfolio in (us_portfolio, ca_portfolio):
+        value, unrealized_pnl = portfolio.calculate_final_value(final_price)
+        print(f"--- {portfolio.name} ---")
+        print(f"Final value:      {value:,.2f}")
+        print(f"Realized PnL:     {portfolio.total_realized_pnl:,.2f}")
+        print(f"Unrealized PnL:   {unrealized_pnl:,.2f}")
+        print(f"Trades executed:  {portfolio.trade_count}")
+
+
+def run_parameter_sweep(buy_triggers, profit_targets):
+    """Runs the US simulation for a grid of trigger pairs in one pass.
+
+    Returns (final_values, realized_pnls, trade_counts) arrays, one entry
+    per (buy_trigger, profit_target) pair.
+    """
+    if not NUMBA_AVAILABLE:
+        raise RuntimeError("numba is required for the parameter sweep")
+    lot_map_df = pd.read_csv(LOTS_CSV_FILE, header=None,
+                             names=['level', 'shares_to_buy'])
+    prices = load_synthetic_data()
+    lot_shares = lot_map_df['shares_to_buy'].to_numpy(np.int64)
+    cash, shares, realized, trades = _simulate_batch(
+        prices, lot_shares,
+        np.ascontiguousarray(buy_triggers, np.float64),
+        np.ascontiguousarray(profit_targets, np.float64),
+        INITIAL_CAPITAL)
+    final_price = float(prices[-1])
+    return cash + shares * final_price, realized, trades
+
+
+if __name__ == '__main__':
+    run_simulation()
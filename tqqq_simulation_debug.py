@@ -0,0 +1,114 @@
+"""Debug build of the grid simulation: logs every simulated trade.
+
+Runs the same portfolios as tqqq_simulation.py but with per-bar trade
+logging so a run can be diffed against the live bot's decisions.
+"""
+import logging
+from logging.handlers import MemoryHandler
+
+import numpy as np
+import pandas as pd
+
+from tqqq_simulation import (
+    INITIAL_CAPITAL,
+    LOTS_CSV_FILE,
+    SYNTHETIC_DB_FILE,
+    SYNTHETIC_TABLE_NAME,
+    CanadianPortfolio,
+    USPortfolio,
+    _connect_readonly,
+)
+
+# StreamHandler flushes after every record, so buffering the underlying
+# stream would not batch anything; a MemoryHandler actually does, holding
+# records in memory and draining them to the file in 8192-record blocks
+# (errors and the final logging.shutdown() flush immediately).
+_file_handler = logging.FileHandler("log_tqqq_simulation_debug.log", mode='w')
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        MemoryHandler(8192, flushLevel=logging.ERROR, target=_file_handler),
+        logging.StreamHandler(),
+    ],
+)
+log = logging.getLogger()
+
+
+class DebugUSPortfolio(USPortfolio):
+    """US portfolio that logs each executed trade."""
+
+    # %-style args behind an isEnabledFor check: when DEBUG is filtered,
+    # neither the message string nor its arguments get formatted.
+
+    def attempt_buy(self, price):
+        level_before = self.next_buy_level
+        super().attempt_buy(price)
+        if self.next_buy_level != level_before and log.isEnabledFor(logging.DEBUG):
+            log.debug("[%s] %s: BUY L%d @ %.2f",
+                      self.name, self.timestamp, level_before, price)
+
+    def attempt_sell(self, price):
+        trades_before = self.trade_count
+        super().attempt_sell(price)
+        if self.trade_count != trades_before and log.isEnabledFor(logging.DEBUG):
+            log.debug("[%s] %s: SELL @ %.2f (realized %.2f)",
+                      self.name, self.timestamp, price, self.total_realized_pnl)
+
+
+class DebugCanadianPortfolio(CanadianPortfolio):
+    """Canadian portfolio that logs each executed trade."""
+
+    def attempt_buy(self, price):
+        level_before = self.next_buy_level
+        super().attempt_buy(price)
+        if self.next_buy_level != level_before and log.isEnabledFor(logging.DEBUG):
+            log.debug("[%s] %s: BUY L%d @ %.2f",
+                      self.name, self.timestamp, level_before, price)
+
+    def attempt_sell(self, price):
+        trades_before = self.trade_count
+        super().attempt_sell(price)
+        if self.trade_count != trades_before and log.isEnabledFor(logging.DEBUG):
+            log.debug("[%s] %s: SELL @ %.2f (realized %.2f)",
+                      self.name, self.timestamp, price, self.total_realized_pnl)
+
+
+def run_simulation():
+    """Runs both portfolios with trade-by-trade logging."""
+    lot_map_df = pd.read_csv(LOTS_CSV_FILE, header=None,
+                             names=['level', 'shares_to_buy'])
+    # The debug run also needs timestamps for the log lines, so it pulls
+    # its own two-column scan instead of tqqq_simulation's close-only one.
+    conn = _connect_readonly(SYNTHETIC_DB_FILE)
+    rows = conn.execute(
+        f"SELECT timestamp, close FROM {SYNTHETIC_TABLE_NAME} "
+        "ORDER BY timestamp").fetchall()
+    conn.close()
+    timestamps = np.array([row[0] for row in rows])
+    prices = np.array([row[1] for row in rows], dtype=np.float64)
+
+    us_portfolio = DebugUSPortfolio('US (FIFO)', lot_map_df, INITIAL_CAPITAL)
+    ca_portfolio = DebugCanadianPortfolio('Canada (average cost)', lot_map_df,
+                                          INITIAL_CAPITAL)
+    log.info(f"Simulating {prices.shape[0]} bars with debug logging...")
+    for i in range(prices.shape[0]):
+        price = prices[i]
+        us_portfolio.timestamp = ca_portfolio.timestamp = timestamps[i]
+        us_portfolio.attempt_sell(price)
+        us_portfolio.attempt_buy(price)
+        ca_portfolio.attempt_sell(price)
+        ca_portfolio.attempt_buy(price)
+
+    final_price = float(prices[-1])
+    for portfolio in (us_portfolio, ca_portfolio):
+        value, unrealized_pnl = portfolio.calculate_final_value(final_price)
+        log.info(f"--- {portfolio.name} ---")
+        log.info(f"Final value:      {value:,.2f}")
+        log.info(f"Realized PnL:     {portfolio.total_realized_pnl:,.2f}")
+        log.info(f"Unrealized PnL:   {unrealized_pnl:,.2f}")
+        log.info(f"Trades executed:  {portfolio.trade_count}")
+
+
+if __name__ == '__main__':
+    run_simulation()
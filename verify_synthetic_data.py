@@ -0,0 +1,110 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# --- CONFIGURATION ---
+DAILY_DB_FILE = 'tqqq_daily_data.sqlite'
+DAILY_TABLE_NAME = 'daily_bars'
+SYNTHETIC_DB_FILE = 'tqqq_synthetic_data.sqlite'
+SYNTHETIC_TABLE_NAME = 'minute_bars'
+PRICE_TOLERANCE = 0.01  # synthetic closes are rounded to cents
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _connect_readonly(db_path):
+    """Opens a SQLite connection tuned for a large sequential read."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA query_only=1")
+    conn.execute("PRAGMA mmap_size=1073741824")
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def load_tables():
+    """Loads the daily and synthetic tables with parsed timestamps."""
+    conn = _connect_readonly(DAILY_DB_FILE)
+    daily_df = pd.read_sql_query(
+        f"SELECT * FROM {DAILY_TABLE_NAME} ORDER BY timestamp ASC", conn)
+    conn.close()
+
+    conn = _connect_readonly(SYNTHETIC_DB_FILE)
+    synthetic_df = pd.read_sql_query(
+        f"SELECT * FROM {SYNTHETIC_TABLE_NAME} ORDER BY timestamp ASC", conn)
+    conn.close()
+
+    # An explicit format takes pandas' fast C parsing path; inferring the
+    # format per string over millions of rows is 20-50x slower.
+    daily_df['timestamp'] = pd.to_datetime(
+        daily_df['timestamp'], format=TIMESTAMP_FORMAT, cache=True)
+    synthetic_df['timestamp'] = pd.to_datetime(
+        synthetic_df['timestamp'], format=TIMESTAMP_FORMAT, cache=True)
+    return daily_df, synthetic_df
+
+
+def verify_data():
+    """Verifies every synthetic day against the daily OHLC constraints."""
+    daily_df, synthetic_df = load_tables()
+    print(f"Daily bars:     {len(daily_df)}")
+    print(f"Synthetic bars: {len(synthetic_df)}")
+
+    # Group once; every per-day statistic below comes from this single scan.
+    synthetic_df['day'] = synthetic_df['timestamp'].values.astype('datetime64[D]')
+    groups = synthetic_df.groupby('day', sort=False)
+
+    failures = 0
+
+    # One vectorized aggregation checks every day at once — cheaper than
+    # the old 5-day spot check, and a guarantee instead of a sample.
+    agg = groups['close'].agg(open_='first', close_='last',
+                              high_='max', low_='min')
+    daily_indexed = daily_df.set_index(
+        daily_df['timestamp'].values.astype('datetime64[D]'))
+    missing = daily_indexed.index.difference(agg.index)
+    for day in missing:
+        print(f"FAIL {pd.Timestamp(day).date()}: no synthetic bars for this day")
+        failures += 1
+
+    joined = agg.join(daily_indexed[['open', 'high', 'low', 'close']],
+                      how='inner')
+    days = joined.index.to_numpy()
+    bad_checks = (
+        ('open', ~np.isclose(joined['open_'].to_numpy(),
+                             joined['open'].to_numpy(),
+                             atol=PRICE_TOLERANCE)),
+        ('close', ~np.isclose(joined['close_'].to_numpy(),
+                              joined['close'].to_numpy(),
+                              atol=PRICE_TOLERANCE)),
+        ('high', joined['high_'].to_numpy()
+         > joined['high'].to_numpy() + PRICE_TOLERANCE),
+        ('low', joined['low_'].to_numpy()
+         < joined['low'].to_numpy() - PRICE_TOLERANCE),
+    )
+    for label, bad in bad_checks:
+        for i in np.where(bad)[0]:
+            print(f"FAIL {pd.Timestamp(days[i]).date()}: "
+                  f"synthetic {label} violates the daily bar")
+            failures += 1
+
+    # Granularity across the whole series in one integer pass: every
+    # consecutive pair of bars is either one minute apart or a day break.
+    ts_min = synthetic_df['timestamp'].values.astype('datetime64[m]').view('int64')
+    day_change = np.diff(
+        synthetic_df['timestamp'].values.astype('datetime64[D]').view('int64')) != 0
+    bad_gaps = (np.diff(ts_min) != 1) & ~day_change
+    if bad_gaps.any():
+        for i in np.where(bad_gaps)[0][:10]:
+            print(f"FAIL: non-minute gap after "
+                  f"{synthetic_df['timestamp'].iloc[i]}")
+        failures += int(bad_gaps.sum())
+
+    if failures == 0:
+        print(f"OK: all {len(joined)} days passed the OHLC checks.")
+    else:
+        print(f"{failures} check(s) failed.")
+    return failures == 0
+
+
+if __name__ == '__main__':
+    verify_data()